@@ -1,9 +1,16 @@
 import os
+import re
+import math
+import functools
 
 import numpy as np
+import matplotlib.colors
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.figure import SubplotParams
 
 import clawpack.visclaw.colormaps as colormap
+import clawpack.visclaw.geoplot as geoplot
 import clawpack.visclaw.gaugetools as gaugetools
 import clawpack.clawutil.data as clawutil
 import clawpack.amrclaw.data as amrclaw
@@ -17,6 +24,11 @@ try:
 except:
     setplotfg = None
 
+try:
+    import numba
+except ImportError:
+    numba = None
+
 # def gauge_topo(cd, dry_tolerance=1e-16, topo_index=None):
 #     """"""
 #     if not topo_index:
@@ -41,6 +53,297 @@ except:
 #     return cd.gaugesoln.q[pressure_index, :]
 
 
+# Derived gauge quantities: wind speed (gauge fields 5 and 6), pressure
+# (gauge field 7) and topography (gauge field 4) computed in a single pass
+if numba is not None:
+    @numba.guvectorize(['void(f8[:, :], f8[:], f8[:], f8[:])'],
+                       '(v,t)->(t),(t),(t)', nopython=True, cache=True)
+    def _gauge_derive(q, wind, pressure, topo):
+        for k in range(q.shape[1]):
+            wind[k] = math.sqrt(q[5, k] * q[5, k] + q[6, k] * q[6, k])
+            pressure[k] = q[7, k]
+            topo[k] = q[4, k]
+else:
+    def _gauge_derive(q, wind, pressure, topo):
+        np.hypot(q[5, :], q[6, :], out=wind)
+        pressure[:] = q[7, :]
+        topo[:] = q[4, :]
+
+
+def _derived(gauge):
+    """Wind speed, pressure and topography at a gauge as rows of one array"""
+    # Computed once per gauge and kept on the gauge solution
+    derived = getattr(gauge, '_derived', None)
+    if derived is None:
+        derived = np.empty((3, gauge.q.shape[1]))
+        _gauge_derive(gauge.q, derived[0], derived[1], derived[2])
+        gauge._derived = derived
+    return derived
+
+
+def _wind_speed(gauge):
+    """Wind speed at a gauge"""
+    return _derived(gauge)[0]
+
+
+def _pressure(gauge):
+    """Pressure at a gauge"""
+    return _derived(gauge)[1]
+
+
+def _topo(gauge):
+    """Topography at a gauge"""
+    return _derived(gauge)[2]
+
+
+# Gauge plot_var functions, defined at module level so that they can be
+# pickled by parallel plotting workers
+def _gauge_wind5(cd):
+    """Wind speed at a gauge, wind is in gauge fields 5 and 6"""
+    return _wind_speed(cd.gaugesoln)
+
+
+def _gauge_pressure7(cd):
+    """Pressure at a gauge, pressure is in gauge field 7"""
+    return _pressure(cd.gaugesoln)
+
+
+def _gauge_topo4(cd):
+    """Topography at a gauge, topography is in gauge field 4"""
+    return _topo(cd.gaugesoln)
+
+
+_INV_DAY = 1.0 / 86400.0
+
+
+# Color limits
+_SURFACE_LIMITS = (-5.0, 5.0)
+_LAND_LIMITS = (0.0, 20.0)
+_SPEED_LIMITS = (0.0, 3.0)
+_WIND_LIMITS = (0, 64)
+_PRESSURE_LIMITS = (935, 1013)
+_FRICTION_BOUNDS = (0.01, 0.04)
+
+# Surface colormap stacked below the land colormap, built once so that its
+# lookup table is shared by every surface figure and frame
+_SURFACE_LAND_CMAP = matplotlib.colors.ListedColormap(np.vstack(
+                            [surgeplot.surface_cmap(np.linspace(0, 1, 256)),
+                             surgeplot.land_cmap(np.linspace(0, 1, 256))]))
+
+# AMR patch and cell edge toggles, shared by all plot items (read only)
+_ON10 = [1] * 10
+_OFF10 = [0] * 10
+
+# Plot every quantity for each gauge separately in addition to the all gauge
+# figures, one figure per gauge and quantity
+_PLOT_EACH_GAUGE = False
+
+
+# Parsed run data, keyed by the path and modification time of each data file
+# so that repeated setplot calls (e.g. one per parallel plotting worker) only
+# read the data files once, and read them again once a new run rewrites them
+def _data_file(outdir, fname):
+    """Return the path of fname in outdir and its modification time"""
+    path = os.path.join(outdir, fname)
+    return path, os.stat(path).st_mtime_ns
+
+
+@functools.lru_cache(maxsize=16)
+def _read_data(path, mtime_ns, data_class, *args):
+    data = data_class(*args)
+    data.read(path)
+    return data
+
+
+def _load_clawdata(outdir):
+    return _read_data(*_data_file(outdir, 'claw.data'),
+                      clawutil.ClawInputData, 2)
+
+
+def _load_geo(outdir):
+    return _read_data(*_data_file(outdir, 'geoclaw.data'),
+                      geodata.GeoClawData)
+
+
+def _load_surge(outdir):
+    return _read_data(*_data_file(outdir, 'surge.data'), geodata.SurgeData)
+
+
+def _load_friction(outdir):
+    return _read_data(*_data_file(outdir, 'friction.data'),
+                      geodata.FrictionData)
+
+
+class _MappedTrack(surgeplot.track_data):
+    """Storm track backed by a memory-mapped copy of the parsed fort.track"""
+
+    def __init__(self, path, data):
+        # Mirrors the attributes set by surgeplot.track_data without parsing
+        self._path = path
+        self._data = data
+
+
+def _cached_track(outdir):
+    """Load the storm track, parsing the ASCII fort.track at most once
+
+    The parsed track is saved next to fort.track as fort.track.npy and any
+    later load memory-maps that file instead.  The sidecar is rebuilt if
+    fort.track is newer than it.  If the sidecar cannot be written, e.g. the
+    output directory is read-only, the parsed track is returned instead.
+    """
+    track_path = os.path.join(outdir, 'fort.track')
+    npy_path = track_path + '.npy'
+    if not os.path.exists(track_path):
+        return surgeplot.track_data(track_path)
+
+    if (not os.path.exists(npy_path) or
+            os.path.getmtime(npy_path) < os.path.getmtime(track_path)):
+        track = surgeplot.track_data(track_path)
+        if track._data is None:
+            return track
+        # Write to a temporary file first so that concurrent plotting
+        # processes never see a partially written sidecar
+        tmp_path = "%s.%s" % (npy_path, os.getpid())
+        try:
+            with open(tmp_path, 'wb') as tmp_file:
+                np.save(tmp_file, np.asarray(track._data, dtype=np.float64))
+            os.replace(tmp_path, npy_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return track
+
+    return _MappedTrack(track_path, np.load(npy_path, mmap_mode='r'))
+
+
+def _plot_regions(clawdata):
+    """Return the domain center and the plot regions for clawdata's domain"""
+    # Center of domain
+    x = (clawdata.upper[0] - clawdata.lower[0]) / 2 + clawdata.lower[0]
+    y = (clawdata.upper[1] - clawdata.lower[1]) / 2 + clawdata.lower[1]
+
+    regions = {"Full": {"xlimits": (clawdata.lower[0], clawdata.upper[0]),
+                        "ylimits": (clawdata.lower[1], clawdata.upper[1]),
+                        "figsize": (6.4, 4.8)},
+               "Zoom": {"xlimits": (x - 2, x + 2), 
+                        "ylimits": (y - 2, y + 2),
+                        "figsize": (6.4, 4.8)},}
+
+    return x, y, regions
+
+
+def _surface_or_land(cd, surface_bounds, land_bounds):
+    """Surface or depth where wet and shifted topography where dry
+
+    Wet cells show the same values as geoplot.surface_or_depth (surface over
+    the sea, depth over land) clipped to surface_bounds.  Dry cells show the
+    topography mapped from land_bounds onto the interval of the same width
+    directly above surface_bounds so that both can share one color scale, see
+    _fused_surface_land.
+    """
+    drytol = cd.user.get('dry_tolerance', geoplot.drytol_default)
+    h = cd.q[0, :, :]
+    eta = cd.q[3, :, :]
+    topo = eta - h
+
+    # The fused colormap has 512 entries over twice the surface width.  The
+    # surface is kept half an entry below the split so that rounding, also in
+    # single precision, cannot carry it into the land colors.
+    width = surface_bounds[1] - surface_bounds[0]
+    surface = np.clip(np.where(topo < 0, eta, h), surface_bounds[0],
+                      surface_bounds[1] - width / 512)
+    land = np.clip(topo, land_bounds[0], land_bounds[1])
+    land = surface_bounds[1] + (land - land_bounds[0]) * (
+                                width / (land_bounds[1] - land_bounds[0]))
+    return np.where(h > drytol, surface, land)
+
+
+def _fused_surface_land(plotaxes, surface_bounds, land_bounds):
+    """Add surface and land as a single pcolor plot item named 'surface'
+
+    Replaces the pair surgeplot.add_surface_elevation and surgeplot.add_land
+    so that each patch is drawn as one QuadMesh instead of two.  The lower
+    half of the colormap is the surface colormap and the upper half the land
+    colormap.
+    """
+    width = surface_bounds[1] - surface_bounds[0]
+
+    plotitem = plotaxes.new_plotitem(name='surface', plot_type='2d_pcolor')
+    plotitem.plot_var = functools.partial(_surface_or_land,
+                                          surface_bounds=surface_bounds,
+                                          land_bounds=land_bounds)
+    plotitem.pcolor_cmap = _SURFACE_LAND_CMAP
+    plotitem.pcolor_cmin = surface_bounds[0]
+    plotitem.pcolor_cmax = surface_bounds[1] + width
+    plotitem.add_colorbar = True
+    # Only show the surface half of the colormap on the colorbar
+    plotitem.colorbar_kwargs = {"boundaries": np.linspace(surface_bounds[0],
+                                                          surface_bounds[1],
+                                                          257)}
+    plotitem.colorbar_ticks = np.linspace(surface_bounds[0],
+                                          surface_bounds[1], 5)
+    plotitem.colorbar_label = "Surface Height (m)"
+    plotitem.amr_celledges_show = _OFF10
+    plotitem.amr_patchedges_show = _ON10
+    return plotitem
+
+
+def _float32_plot_var(cd, plot_var):
+    """Evaluate plot_var and return the result as single precision"""
+    if callable(plot_var):
+        var = plot_var(cd)
+    else:
+        var = cd.q[plot_var, ...]
+    return np.asanyarray(var).astype(np.float32, copy=False)
+
+
+def _float32_items(plotaxes):
+    """Hand the data of every plot item on plotaxes to matplotlib as float32
+
+    Colors are mapped through colormaps of at most 512 entries so single
+    precision is more than enough and halves the data normalized per cell.
+    """
+    for plotitem in plotaxes.plotitem_dict.values():
+        plotitem.plot_var = functools.partial(_float32_plot_var,
+                                              plot_var=plotitem.plot_var)
+
+
+def _add_all_gauges_figure(plotdata, quantity_fn, name, fname, ylabel):
+    """Add a figure showing quantity_fn for every gauge in one axes
+
+    Registered as an other figure so that it is drawn and saved to fname once
+    per run, with all gauge time series drawn as a single LineCollection
+    rather than one figure per gauge.
+    """
+    def makefig(plotdata):
+        gauge_data = amrclaw.GaugeData()
+        gauge_data.read(plotdata.outdir)
+        segments = []
+        for gaugeno in gauge_data.gauge_numbers:
+            gauge = plotdata.getgauge(gaugeno)
+            if gauge is not None:
+                # Gauge times are in seconds
+                segments.append(np.column_stack([gauge.t * _INV_DAY,
+                                                 quantity_fn(gauge)]))
+
+        fig, ax = plt.subplots()
+        ax.add_collection(LineCollection(segments, colors='k',
+                                         linewidths=0.75, alpha=0.5))
+        ax.set_xlim(0, 4)
+        ax.autoscale_view(scalex=False)
+        ax.grid(True)
+        ax.set_title(name)
+        ax.set_xlabel("Days relative to landfall")
+        ax.set_ylabel(ylabel)
+        fig.savefig(fname)
+        plt.close(fig)
+
+    otherfigure = plotdata.new_otherfigure(name="All Gauges - %s" % name,
+                                           fname=fname)
+    otherfigure.makefig = makefig
+    return otherfigure
+
+
 def setplot(plotdata=None):
     """"""
 
@@ -53,19 +356,16 @@ def setplot(plotdata=None):
     plotdata.format = 'binary'
 
     # Load data from output
-    clawdata = clawutil.ClawInputData(2)
-    clawdata.read(os.path.join(plotdata.outdir, 'claw.data'))
-    physics = geodata.GeoClawData()
-    physics.read(os.path.join(plotdata.outdir, 'geoclaw.data'))
-    surge_data = geodata.SurgeData()
-    surge_data.read(os.path.join(plotdata.outdir, 'surge.data'))
-    friction_data = geodata.FrictionData()
-    friction_data.read(os.path.join(plotdata.outdir, 'friction.data'))
+    outdir = os.path.abspath(plotdata.outdir)
+    clawdata = _load_clawdata(outdir)
+    physics = _load_geo(outdir)
+    surge_data = _load_surge(outdir)
+    friction_data = _load_friction(outdir)
 
     # Load storm track
     # track_path = os.path.join(plotdata.outdir, 'fort.track')
     # print("This is the track path: " + track_path)
-    track = surgeplot.track_data(os.path.join(plotdata.outdir, 'fort.track'))
+    track = _cached_track(outdir)
 
 
 
@@ -74,16 +374,8 @@ def setplot(plotdata=None):
         surgeplot.surge_afteraxes(cd, track, plot_direction=False,
                                              kwargs={"markersize": 4})
 
-    # Color limits
-    surface_limits = [-5.0, 5.0]
-    speed_limits = [0.0, 3.0]
-    wind_limits = [0, 64]
-    pressure_limits = [935, 1013]
-    friction_bounds = [0.01, 0.04]
-
-    # Center of domain
-    x = (clawdata.upper[0] - clawdata.lower[0]) / 2 + clawdata.lower[0]
-    y = (clawdata.upper[1] - clawdata.lower[1]) / 2 + clawdata.lower[1]
+    # Center of domain and plot regions
+    x, y, regions = _plot_regions(clawdata)
 
     def friction_after_axes(cd):
         plt.title(r"Manning's $n$ Coefficient")
@@ -91,13 +383,6 @@ def setplot(plotdata=None):
     # ==========================================================================
     #   Plot specifications
     # ==========================================================================
-    regions = {"Full": {"xlimits": (clawdata.lower[0], clawdata.upper[0]),
-                        "ylimits": (clawdata.lower[1], clawdata.upper[1]),
-                        "figsize": (6.4, 4.8)},
-               "Zoom": {"xlimits": (x - 2, x + 2), 
-                        "ylimits": (y - 2, y + 2),
-                        "figsize": (6.4, 4.8)},}
-
     for (i, (name, region_dict)) in enumerate(regions.items()):
 
         # Surface Figure
@@ -109,12 +394,10 @@ def setplot(plotdata=None):
         plotaxes.ylimits = region_dict["ylimits"]
         plotaxes.afteraxes = surge_afteraxes
 
-        surgeplot.add_surface_elevation(plotaxes, bounds=surface_limits)
-        surgeplot.add_land(plotaxes, bounds=[0.0, 20.0])
-        plotaxes.plotitem_dict['surface'].amr_patchedges_show = [1] * 10
-        plotaxes.plotitem_dict['land'].amr_patchedges_show = [1] * 10
-        # plotaxes.plotitem_dict['surface'].amr_celledges_show = [1] * 10
-        # plotaxes.plotitem_dict['land'].amr_celledges_show = [1] * 10
+        _fused_surface_land(plotaxes, _SURFACE_LIMITS, _LAND_LIMITS)
+        _float32_items(plotaxes)
+        plotaxes.plotitem_dict['surface'].amr_patchedges_show = _ON10
+        # plotaxes.plotitem_dict['surface'].amr_celledges_show = _ON10
 
         # Speed Figure
         plotfigure = plotdata.new_plotfigure(name="Currents - %s" % name)
@@ -125,39 +408,42 @@ def setplot(plotdata=None):
         plotaxes.ylimits = region_dict["ylimits"]
         plotaxes.afteraxes = surge_afteraxes
 
-        surgeplot.add_speed(plotaxes, bounds=speed_limits)
-        surgeplot.add_land(plotaxes, bounds=[0.0, 20.0])
-        plotaxes.plotitem_dict['speed'].amr_patchedges_show = [0] * 10
-        plotaxes.plotitem_dict['land'].amr_patchedges_show = [0] * 10
+        surgeplot.add_speed(plotaxes, bounds=_SPEED_LIMITS)
+        surgeplot.add_land(plotaxes, bounds=_LAND_LIMITS)
+        _float32_items(plotaxes)
+        plotaxes.plotitem_dict['speed'].amr_patchedges_show = _OFF10
+        plotaxes.plotitem_dict['land'].amr_patchedges_show = _OFF10
 
     #
     #  Hurricane Forcing fields
     #
     # Pressure field
-    plotfigure = plotdata.new_plotfigure(name='Pressure')
-    plotfigure.show = surge_data.pressure_forcing and True
+    if surge_data.pressure_forcing:
+        plotfigure = plotdata.new_plotfigure(name='Pressure')
 
-    plotaxes = plotfigure.new_plotaxes()
-    plotaxes.xlimits = regions['Full']['xlimits']
-    plotaxes.ylimits = regions['Full']['ylimits']
-    plotaxes.title = "Pressure Field"
-    plotaxes.afteraxes = surge_afteraxes
-    plotaxes.scaled = True
-    surgeplot.add_pressure(plotaxes, bounds=pressure_limits)
-    surgeplot.add_land(plotaxes, bounds=[0.0, 20.0])
+        plotaxes = plotfigure.new_plotaxes()
+        plotaxes.xlimits = regions['Full']['xlimits']
+        plotaxes.ylimits = regions['Full']['ylimits']
+        plotaxes.title = "Pressure Field"
+        plotaxes.afteraxes = surge_afteraxes
+        plotaxes.scaled = True
+        surgeplot.add_pressure(plotaxes, bounds=_PRESSURE_LIMITS)
+        surgeplot.add_land(plotaxes, bounds=_LAND_LIMITS)
+        _float32_items(plotaxes)
 
     # Wind field
-    plotfigure = plotdata.new_plotfigure(name='Wind Speed')
-    plotfigure.show = surge_data.wind_forcing and True
+    if surge_data.wind_forcing:
+        plotfigure = plotdata.new_plotfigure(name='Wind Speed')
 
-    plotaxes = plotfigure.new_plotaxes()
-    plotaxes.xlimits = regions['Full']['xlimits']
-    plotaxes.ylimits = regions['Full']['ylimits']
-    plotaxes.title = "Wind Field"
-    plotaxes.afteraxes = surge_afteraxes
-    plotaxes.scaled = True
-    surgeplot.add_wind(plotaxes, bounds=wind_limits)
-    surgeplot.add_land(plotaxes, bounds=[0.0, 20.0])
+        plotaxes = plotfigure.new_plotaxes()
+        plotaxes.xlimits = regions['Full']['xlimits']
+        plotaxes.ylimits = regions['Full']['ylimits']
+        plotaxes.title = "Wind Field"
+        plotaxes.afteraxes = surge_afteraxes
+        plotaxes.scaled = True
+        surgeplot.add_wind(plotaxes, bounds=_WIND_LIMITS)
+        surgeplot.add_land(plotaxes, bounds=_LAND_LIMITS)
+        _float32_items(plotaxes)
 
     # ========================================================================
     #  Figures for gauges
@@ -186,7 +472,7 @@ def setplot(plotdata=None):
     # === Gauge Wind
     plotfigure = plotdata.new_plotfigure(name='Gauge Wind Speed',
                                          type='each_gauge', figno=476)
-    plotfigure.show = True
+    plotfigure.show = _PLOT_EACH_GAUGE
     plotfigure.clf_each_gauge = True
 
     plotaxes = plotfigure.new_plotaxes()
@@ -199,12 +485,12 @@ def setplot(plotdata=None):
     plotaxes.time_label = "Days relative to landfall"
     
     plotitem = plotaxes.new_plotitem(plot_type='1d_plot')
-    plotitem.plot_var = lambda cd: surgeplot.gauge_wind(cd, wind_index=5)
+    plotitem.plot_var = _gauge_wind5
 
     # === Gauge Pressure
     plotfigure = plotdata.new_plotfigure(name='Gauge Pressure',
                                          type='each_gauge', figno=477)
-    plotfigure.show = True
+    plotfigure.show = _PLOT_EACH_GAUGE
     plotfigure.clf_each_gauge = True
 
     plotaxes = plotfigure.new_plotaxes()
@@ -217,12 +503,12 @@ def setplot(plotdata=None):
     plotaxes.time_label = "Days relative to landfall"
     
     plotitem = plotaxes.new_plotitem(plot_type='1d_plot')
-    plotitem.plot_var = lambda cd: surgeplot.gauge_pressure(cd, pressure_index=7)
+    plotitem.plot_var = _gauge_pressure7
 
     # === Gauge Bathy
     plotfigure = plotdata.new_plotfigure(name='Gauge Bathy',
                                          type='each_gauge', figno=478)
-    plotfigure.show = True
+    plotfigure.show = _PLOT_EACH_GAUGE
     plotfigure.clf_each_gauge = True
 
     plotaxes = plotfigure.new_plotaxes()
@@ -235,19 +521,29 @@ def setplot(plotdata=None):
     plotaxes.time_label = "Days relative to landfall"
 
     plotitem = plotaxes.new_plotitem(plot_type='1d_plot')
-    plotitem.plot_var = surgeplot.gauge_topo
+    plotitem.plot_var = _gauge_topo4
+
+    # === All gauges, one figure per quantity
+    _add_all_gauges_figure(plotdata, _wind_speed, "Wind Speed",
+                           "all_gauges_wind_speed.png", "Speed (m/s)")
+    _add_all_gauges_figure(plotdata, _pressure, "Pressure",
+                           "all_gauges_pressure.png", "Pressure (kPa)")
+    _add_all_gauges_figure(plotdata, _topo, "Topography",
+                           "all_gauges_topography.png", "Topography (m)")
 
     # =====================
     #  Gauge Location Plot
     # =====================
     def gauge_location_afteraxes(cd):
-        plt.subplots_adjust(left=0.12, bottom=0.06, right=0.97, top=0.97)
         surge_afteraxes(cd)
         gaugetools.plot_gauge_locations(cd.plotdata, gaugenos='all',
                                         format_string='ko', add_labels=False)
 
     plotfigure = plotdata.new_plotfigure(name="Gauge Locations", figno=548)
     plotfigure.show = True
+    # Margins are set when the figure is created rather than every frame
+    plotfigure.kwargs = {"subplotpars": SubplotParams(left=0.12, bottom=0.06,
+                                                      right=0.97, top=0.97)}
 
     # Set up for axes in this figure:
     plotaxes = plotfigure.new_plotaxes()
@@ -256,12 +552,10 @@ def setplot(plotdata=None):
     plotaxes.xlimits = [x - 1.25, x + 1.25]
     plotaxes.ylimits = [y - 1.25, y + 1.25]
     plotaxes.afteraxes = gauge_location_afteraxes
-    surgeplot.add_surface_elevation(plotaxes, bounds=surface_limits)
-    surgeplot.add_land(plotaxes, bounds=[0.0, 20.0])
-    plotaxes.plotitem_dict['surface'].amr_celledges_show = [1] * 10
-    plotaxes.plotitem_dict['land'].amr_celledges_show = [1] * 10
-    # plotaxes.plotitem_dict['surface'].amr_patchedges_show = [1] * 10
-    # plotaxes.plotitem_dict['land'].amr_patchedges_show = [0] * 10
+    _fused_surface_land(plotaxes, _SURFACE_LIMITS, _LAND_LIMITS)
+    _float32_items(plotaxes)
+    plotaxes.plotitem_dict['surface'].amr_celledges_show = _ON10
+    # plotaxes.plotitem_dict['surface'].amr_patchedges_show = _ON10
 
     # -----------------------------------------
     # Parameters used only when creating html and/or latex hardcopy
@@ -269,7 +563,12 @@ def setplot(plotdata=None):
 
     plotdata.printfigs = True                # print figures
     plotdata.print_format = 'png'            # file format
-    plotdata.print_framenos = 'all'          # list of frames to print
+    # plotdata.print_framenos = 'all'          # list of frames to print
+    # Resolve 'all' here with a single directory listing
+    plotdata.print_framenos = sorted(int(match.group(1)) for match in
+                                     (re.match(r'fort\.q(\d{4,})$', fname)
+                                      for fname in os.listdir(outdir))
+                                     if match)
     # plotdata.print_framenos = 'none'          # list of frames to print
     plotdata.print_gaugenos = 'all'
     # plotdata.print_fignos = 'all'            # list of figures to print
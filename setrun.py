@@ -9,23 +9,35 @@ that will be read in by the Fortran code.
 
 from pathlib import Path
 import os
-import datetime
 import shutil
 import gzip
+import hashlib
+import inspect
+import copy
+import functools
 import numpy as np
 
 import clawpack.clawutil.data as data
 from clawpack.geoclaw.surge.storm import Storm
 import clawpack.clawutil as clawutil
 
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
 
-#                           days   s/hour    hours/day            
-days2seconds = lambda days: days * 60.0**2 * 24.0
-seconds2days = lambda seconds: seconds / (60.0**2 * 24.0)
+
+#                 s/hour    hours/day
+SECONDS_PER_DAY = 60.0**2 * 24.0
 
 RAMP_UP_TIME = 0.5  # In days
-# In this case we simply use the default base_date in the surge.data module
-tracy_landfall = datetime.datetime(2008, 8, 1, 12) - datetime.datetime(2008,1,1,0)
+# Landfall of Tracy (2008-08-01 12:00) in seconds from the default base_date
+# (2008-01-01) in the surge.data module
+TRACY_LANDFALL = (213 * 24 + 12) * 3600.0
+
+# Storm translation speed along each axis in degrees / s,
+# 15 km / h -> 1 degree / 110 km * 1 h / 3600 s
+STORM_SPEED_DEG_S = np.sqrt(2) * 15.0 / 110.0 / 3600.0
 
 # Scratch directory for storing topo and storm files:
 CLAW = Path(os.environ["CLAW"])
@@ -48,6 +60,30 @@ def setrun(claw_pkg='geoclaw'):
 
     assert claw_pkg.lower() == 'geoclaw',  "Expected claw_pkg = 'geoclaw'"
 
+    # Everything but the GeoClaw parameters is the same on every call, so it
+    # is only built once and each call modifies its own copy
+    rundata = copy.deepcopy(_build_base_rundata(claw_pkg))
+
+    #------------------------------------------------------------------
+    # GeoClaw specific parameters:
+    #------------------------------------------------------------------
+
+    rundata = setgeo(rundata)   # Defined below
+
+
+    return rundata
+    # end of function setrun
+    # ----------------------
+
+
+#---------------------------------
+@functools.lru_cache(maxsize=4)
+def _build_base_rundata(claw_pkg):
+#---------------------------------
+    """
+    Construct the Clawpack, AMR, region and gauge parameters for setrun.
+    """
+
     ndim = 2
     rundata = data.ClawRunData(claw_pkg, ndim)
 
@@ -105,8 +141,8 @@ def setrun(claw_pkg='geoclaw'):
     # Initial time:
     # -------------
 
-    clawdata.t0 = 0 #-days2seconds(3)
-    clawdata.tfinal = days2seconds(4)
+    clawdata.t0 = 0 #-3 * SECONDS_PER_DAY
+    clawdata.tfinal = 4 * SECONDS_PER_DAY
 
     # Restart from checkpoint file of a previous run?
     # Note: If restarting, you must also change the Makefile to set:
@@ -131,18 +167,18 @@ def setrun(claw_pkg='geoclaw'):
 
     if clawdata.output_style==1:
         # Output nout frames at equally spaced times up to tfinal:
-        # clawdata.tfinal = days2seconds(date2days('2008091400'))
+        # clawdata.tfinal = date2days('2008091400') * SECONDS_PER_DAY
         
         recurrence = 4 # previously 24
         clawdata.num_output_times = int((clawdata.tfinal - clawdata.t0) 
-                                            * recurrence / (60**2 * 24))
+                                            * recurrence / SECONDS_PER_DAY)
 
         clawdata.output_t0 = True  # output at initial (or restart) time?
 
     elif clawdata.output_style == 2:
         # Specify a list of output times.
         clawdata.output_t0 = True  # output at initial (or restart) time?
-        clawdata.output_times = [days2seconds(tracy_landfall.days) + tracy_landfall.seconds + delta_t for delta_t in range(-1*60**2, 100, 500)]
+        clawdata.output_times = [TRACY_LANDFALL + delta_t for delta_t in range(-1*60**2, 100, 500)]
 
     elif clawdata.output_style == 3:
         # Output every iout timesteps with a total of ntot time steps:
@@ -340,57 +376,133 @@ def setrun(claw_pkg='geoclaw'):
     rundata.regiondata.regions = []
     # to specify regions of refinement append lines of the form
     #  [minlevel,maxlevel,t1,t2,x1,x2,y1,y2]
-    x = (clawdata.upper[0] - clawdata.lower[0]) / 2 + clawdata.lower[0]
-    y = (clawdata.upper[1] - clawdata.lower[1]) / 2 + clawdata.lower[1]
+    # Center of domain, used for the refinement region and the gauges
+    x = 0.5 * (clawdata.upper[0] + clawdata.lower[0])
+    y = 0.5 * (clawdata.upper[1] + clawdata.lower[1])
     rundata.regiondata.regions.append([2, 2, clawdata.t0, clawdata.tfinal, 
                                              x - 1, x + 1, y - 1, y + 1])
 
     # == setgauges.data values ==
     rundata.gaugedata.aux_out_fields = [0, 4, 5, 6]
-    gauges = rundata.gaugedata.gauges
     epsilon = 0.13
-    x = (clawdata.upper[0] - clawdata.lower[0]) / 2 + clawdata.lower[0]
-    y = (clawdata.upper[1] - clawdata.lower[1]) / 2 + clawdata.lower[1]
-    gauges.append([0, x, y, clawdata.t0, clawdata.tfinal])
+    gauges = [[0, x, y, clawdata.t0, clawdata.tfinal]]
     gauge_id = 1
     gauges.append([gauge_id,     x + epsilon, y + epsilon, clawdata.t0, clawdata.tfinal])
     gauges.append([gauge_id + 1, x - epsilon, y + epsilon, clawdata.t0, clawdata.tfinal])
     gauges.append([gauge_id + 2, x - epsilon, y - epsilon, clawdata.t0, clawdata.tfinal])
     gauges.append([gauge_id + 3, x + epsilon, y - epsilon, clawdata.t0, clawdata.tfinal])
     gauge_sets = 5
-    for n in range(1, gauge_sets + 1):
-        gauge_id = (n - 1) * 8 + 5
-        # print(f"{gauge_id} - {gauge_id + 8}")
-        # UR
-        gauges.append([gauge_id,     x + epsilon, y + epsilon * n, clawdata.t0, clawdata.tfinal])
-        # UL
-        gauges.append([gauge_id + 1, x - epsilon, y + epsilon * n, clawdata.t0, clawdata.tfinal])
-        # LU
-        gauges.append([gauge_id + 2, x - epsilon * n, y + epsilon, clawdata.t0, clawdata.tfinal])
-        # RU
-        gauges.append([gauge_id + 3, x + epsilon * n, y + epsilon, clawdata.t0, clawdata.tfinal])
-        # DR
-        gauges.append([gauge_id + 4, x + epsilon, y - epsilon * n, clawdata.t0, clawdata.tfinal])
-        # DL
-        gauges.append([gauge_id + 5, x - epsilon, y - epsilon * n, clawdata.t0, clawdata.tfinal])
-        # LD
-        gauges.append([gauge_id + 6, x - epsilon * n, y - epsilon, clawdata.t0, clawdata.tfinal])
-        # RD
-        gauges.append([gauge_id + 7, x + epsilon * n, y - epsilon, clawdata.t0, clawdata.tfinal])
-        
+    gauges.extend(_ring_gauges(x, y, epsilon, gauge_sets, 5,
+                               clawdata.t0, clawdata.tfinal))
+    rundata.gaugedata.gauges.extend(gauges)
+
     # for gauge in gauges:
     #     print(f"{gauge[0]}: ({gauge[1]}, {gauge[2]})")
 
-    #------------------------------------------------------------------
-    # GeoClaw specific parameters:
-    #------------------------------------------------------------------
+    return rundata
+    # end of function _build_base_rundata
+    # -----------------------------------
 
-    rundata = setgeo(rundata)   # Defined below
 
+#-------------------------------------------------------------------
+def _ring_gauges(x, y, epsilon, gauge_sets, first_id, t0, tfinal):
+#-------------------------------------------------------------------
+    """
+    Return gauge_sets sets of 8 gauges around (x, y) numbered from first_id.
 
-    return rundata
-    # end of function setrun
-    # ----------------------
+    Set n has gauges UR, UL, LU, RU, DR, DL, LD and RD, offset from the
+    center by epsilon in one direction and epsilon * n in the other.
+    """
+
+    # Offsets are epsilon * fixed + epsilon * n * scaled
+    #                   UR       UL       LU       RU
+    #                   DR       DL       LD       RD
+    fixed = np.array([[ 1,  0], [-1,  0], [ 0,  1], [ 0,  1],
+                      [ 1,  0], [-1,  0], [ 0, -1], [ 0, -1]])
+    scaled = np.array([[ 0,  1], [ 0,  1], [-1,  0], [ 1,  0],
+                       [ 0, -1], [ 0, -1], [-1,  0], [ 1,  0]])
+    eps_n = epsilon * np.arange(1, gauge_sets + 1)
+    offsets = epsilon * fixed + eps_n[:, None, None] * scaled
+    locations = np.array([x, y]) + offsets.reshape(gauge_sets * 8, 2)
+    gauge_ids = range(first_id, first_id + gauge_sets * 8)
+
+    return [[gauge_id, gauge_x, gauge_y, t0, tfinal]
+            for gauge_id, (gauge_x, gauge_y) in zip(gauge_ids,
+                                                    locations.tolist())]
+    # end of function _ring_gauges
+    # ----------------------------
+
+
+#--------------------------------------
+def build_storm(t0, tfinal, forecasts):
+#--------------------------------------
+    """
+    Construct the synthetic storm with forecasts track points between t0 and
+    tfinal (in seconds).
+    """
+
+    my_storm = Storm(file_format="geoclaw")
+    my_storm.time_offset = np.datetime64("2008-09-13T07")
+    t_series = np.linspace(t0, tfinal, forecasts, dtype=int)
+    my_storm.t = my_storm.time_offset + t_series.astype('timedelta64[s]')
+
+    # Storm moves north-west in a straight line from eye_init
+    eye_init = np.array([-80.0, 15.0])
+    v = np.array([-STORM_SPEED_DEG_S, STORM_SPEED_DEG_S])
+    my_storm.eye_location = eye_init + np.outer(t_series, v)
+    # Gaussian in time centered at the middle of the track
+    mu = t_series[-1] * 0.5
+    inv_sig2 = 1.0 / (t_series[-1] * 0.25)**2
+    if numexpr is not None:
+        max_wind_speed = numexpr.evaluate(
+            "100.0 * exp(-(t - mu)**2 * inv_sig2)",
+            local_dict={"t": t_series, "mu": mu, "inv_sig2": inv_sig2})
+    else:
+        max_wind_speed = 100.0 * np.exp(-(t_series - mu)**2 * inv_sig2)
+    
+    my_storm.max_wind_speed = max_wind_speed
+
+    # Max Wind Radius
+    #   C0 - 1.2014 w + (w / 10.9884)**2 - (w / 35.3052)**3 - 145.5090 cos(lat)
+    # evaluated in Horner form
+    C0 = 218.3784
+    a2 = 1.0 / 10.9884**2
+    a3 = -1.0 / 35.3052**3
+    lat = np.deg2rad(my_storm.eye_location[:, 1])
+    # print(storm.eye_location[:, 1].shape, storm.max_wind_speed.shape[0])
+    if numexpr is not None:
+        my_storm.max_wind_radius = numexpr.evaluate(
+            "(C0 + w * (-1.2014 + w * (a2 + w * a3)) - 145.5090 * cos(lat))"
+            " * 1000", local_dict={"C0": C0, "w": max_wind_speed,
+                                   "a2": a2, "a3": a3, "lat": lat})
+    else:
+        max_wind_radius = np.multiply(max_wind_speed, a3)
+        max_wind_radius += a2
+        max_wind_radius *= max_wind_speed
+        max_wind_radius -= 1.2014
+        max_wind_radius *= max_wind_speed
+        max_wind_radius += C0
+        max_wind_radius -= 145.5090 * np.cos(lat)
+        max_wind_radius *= 1000
+        my_storm.max_wind_radius = max_wind_radius
+
+    # Add central pressure - From Kossin, J. P. WAF 2015
+    a = -0.0025
+    b = -0.36
+    c = 1021.36
+    if numexpr is not None:
+        my_storm.central_pressure = numexpr.evaluate(
+            "(a * w + b) * w + c", local_dict={"a": a, "b": b, "c": c,
+                                               "w": max_wind_speed})
+    else:
+        my_storm.central_pressure = (a * max_wind_speed + b) * max_wind_speed + c
+
+    # Extent of storm set to 300 km 
+    my_storm.storm_radius = np.full(my_storm.t.shape, 300000.0)
+
+    return my_storm
+    # end of function build_storm
+    # ---------------------------
 
 
 #-------------------
@@ -476,46 +588,43 @@ def setgeo(rundata):
     
     # Storm parameters 
     data.storm_specification_type = "holland80" #previously 0
-    data.storm_file = (Path() / 'my_storm.storm').resolve()
 
     # 16 time steps, because 6 hour steps in 4 days
     forecasts = 16
-    my_storm = Storm(file_format="geoclaw")
-    my_storm.time_offset = np.datetime64("2008-09-13T07")
-    t_series = np.linspace(rundata.clawdata.t0, rundata.clawdata.tfinal, forecasts, dtype=int)
-    my_storm.t = np.array([my_storm.time_offset + np.timedelta64(t, 's') 
-                                for t in t_series])
-
-    def storm_location(t):
-        eye_init = (-80, 15)
-        # 15 km / h -> 1 degree / 110 km * 1 h / 3600 s
-        v = (-np.sqrt(2) * 15 / 110 / 3600, np.sqrt(2) * 15 / 110 / 3600)
-        return [v[i] * t + eye_init[i] for i in range(2)]
-    my_storm.eye_location = np.array(storm_location(t_series)).transpose()
-    max_wind_speed = 100 * np.exp(-(t_series - (t_series[-1] / 2))**2 / (t_series[-1] / 4)**2)
-    
-    my_storm.max_wind_speed = max_wind_speed
-
-    # Max Wind Radius
-    C0 = 218.3784 * np.ones(max_wind_speed.shape[0])
-    # print(storm.eye_location[:, 1].shape, storm.max_wind_speed.shape[0])
-    my_storm.max_wind_radius = ( C0 - 1.2014 * max_wind_speed 
-    + (max_wind_speed / 10.9884)**2 
-    - (max_wind_speed / 35.3052)**3 
-    - 145.5090 * np.cos(my_storm.eye_location[:, 1] * 0.0174533) )*1000
-
-    # Add central pressure - From Kossin, J. P. WAF 2015
-    a = -0.0025
-    b = -0.36
-    c = 1021.36
-    my_storm.central_pressure = ( a * max_wind_speed**2
-    + b * max_wind_speed
-    + c)
-
-    # Extent of storm set to 300 km 
-    my_storm.storm_radius = 300000 * np.ones(my_storm.t.shape)
 
-    my_storm.write("my_storm.storm", file_format='geoclaw')
+    # The storm only depends on these inputs so it is built and written in
+    # ASCII once per set of them and kept in the scratch directory
+    storm_key = hashlib.md5(repr((rundata.clawdata.t0,
+                                  rundata.clawdata.tfinal,
+                                  forecasts,
+                                  STORM_SPEED_DEG_S,
+                                  inspect.getsource(build_storm))
+                                 ).encode()).hexdigest()
+    # Cached storms are named by the md5 of their contents, the sidecar
+    # storm_<key>.md5 records which one belongs to this set of inputs
+    storm_index = scratch_dir / f"storm_{storm_key}.md5"
+    storm_cache = None
+    if storm_index.exists():
+        storm_md5 = storm_index.read_text().strip()
+        storm_cache = scratch_dir / f"storm_{storm_md5}.storm"
+    if storm_cache is None or not storm_cache.exists():
+        scratch_dir.mkdir(parents=True, exist_ok=True)
+        my_storm = build_storm(rundata.clawdata.t0, rundata.clawdata.tfinal,
+                               forecasts)
+        # Write to a temporary file first so an interrupted write is never
+        # mistaken for a cached storm
+        storm_tmp = scratch_dir / f"storm_{os.getpid()}.tmp"
+        my_storm.write(str(storm_tmp), file_format='geoclaw')
+        storm_md5 = hashlib.md5(storm_tmp.read_bytes()).hexdigest()
+        storm_cache = scratch_dir / f"storm_{storm_md5}.storm"
+        if storm_cache.exists():
+            # Identical storm already cached, leave it (and its mtime) alone
+            storm_tmp.unlink()
+        else:
+            os.replace(storm_tmp, storm_cache)
+        storm_index.write_text(storm_md5)
+    # GeoClaw reads the cached storm directly
+    data.storm_file = storm_cache.resolve()
     data.display_landfall_time = False
 
     